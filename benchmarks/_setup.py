@@ -0,0 +1,14 @@
+"""Shared setup for benchmarks.
+
+Importing any submodule of the plugin imports the package `__init__`, which
+requires an initialized nonebot. Benchmarks import this module first.
+"""
+
+import sys
+from pathlib import Path
+
+import nonebot
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+nonebot.init(driver="~none", log_level="WARNING")
@@ -0,0 +1,39 @@
+"""Bytes and encode time of a board image per output format.
+
+Usage: python benchmarks/bench_encode.py
+"""
+
+import timeit
+
+import _setup  # noqa: F401
+
+from nonebot_plugin_wordle_daily.image import IMWordle
+from nonebot_plugin_wordle_daily.util import ImageEncoder
+
+NUMBER = 20
+
+ENCODERS = {
+    f"{format}{'-palette' if palette else ''}/{compress}": ImageEncoder(
+        format, compress, palette  # type: ignore
+    )
+    for format, palette in (
+        ("png", False),
+        ("png", True),
+        ("webp", False),
+        ("jpeg", False),
+    )
+    for compress in ("fast", "default", "small")
+}
+
+
+def main() -> None:
+    im = IMWordle().draw(["cigar", "rebut", "sissy", "humph", "awake"], raw_im=True)
+    print(f"{'format':>20} {'bytes':>8} {'encode':>9}")
+    for name, encoder in ENCODERS.items():
+        size = len(encoder(im))
+        seconds = min(timeit.repeat(lambda: encoder(im), number=NUMBER, repeat=3))
+        print(f"{name:>20} {size:>8} {seconds / NUMBER * 1e3:>7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Time and memory of loading the plugin, each run in a fresh interpreter.
+
+Usage: python benchmarks/bench_import.py [runs]
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+CHILD = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+import nonebot
+nonebot.init(driver="~none", log_level="WARNING")
+import nonebot.adapters.onebot.v11
+nonebot.load_plugin("nonebot_plugin_params")
+
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+before = rss()
+start = time.perf_counter()
+nonebot.load_plugin("nonebot_plugin_wordle_daily")
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "rss": rss() - before}}))
+"""
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    code = CHILD.format(root=str(Path(__file__).parent.parent))
+    seconds, rss = [], []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, check=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        seconds.append(result["seconds"])
+        rss.append(result["rss"])
+    print(f"load_plugin: median {statistics.median(seconds) * 1e3:.1f}ms")
+    print(f"rss growth: median {statistics.median(rss) / 1024:.0f}KiB")
+
+
+if __name__ == "__main__":
+    main()
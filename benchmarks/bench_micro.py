@@ -0,0 +1,60 @@
+"""Micro-benchmarks of the guess hot path.
+
+Usage: python benchmarks/bench_micro.py
+"""
+
+import timeit
+from typing import Callable, List
+
+import _setup  # noqa: F401
+
+from nonebot_plugin_wordle_daily.image import BoardCanvas, IMWordle
+from nonebot_plugin_wordle_daily.scoring import score
+from nonebot_plugin_wordle_daily.util import (
+    ImageEncoder,
+    generate_share_msg,
+    get_answer,
+    im2bytes,
+    validate_word,
+)
+from nonebot_plugin_wordle_daily.words import allowed, answers
+
+WORDS = ["cigar", "rebut", "sissy", "humph", "awake"]
+
+
+def bench(name: str, func: Callable[[], object], number: int) -> None:
+    seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"{name:>36}: {seconds * 1e6:10.2f}us")
+
+
+def bench_draw_row(words: List[str]) -> None:
+    # paint the last row onto a canvas already holding the others
+    canvas = BoardCanvas()
+    painter = IMWordle()
+    painter.draw(words, raw_im=True, canvas=canvas)
+
+    def draw_row() -> None:
+        canvas.rows = len(words) - 1
+        painter.draw(words, raw_im=True, canvas=canvas)
+
+    bench("IMWordle.draw (raw, +1 row)", draw_row, 500)
+
+
+def main() -> None:
+    answer = get_answer()
+    codes = [score(word, answer) for word in WORDS]
+    bench("validate_word (valid)", lambda: validate_word(allowed[-1]), 100000)
+    bench("validate_word (invalid)", lambda: validate_word("zzzzz"), 100000)
+    bench("score", lambda: score(answers[1], answer), 100000)
+    bench("generate_share_msg", lambda: generate_share_msg(codes), 100000)
+    bench("IMWordle.draw (raw, full board)", lambda: IMWordle().draw(WORDS, True), 500)
+    bench_draw_row(WORDS)
+    bench("IMWordle.draw (png)", lambda: IMWordle().draw(WORDS), 50)
+    palette = IMWordle(encoder=ImageEncoder(palette=True))
+    bench("IMWordle.draw (palette png)", lambda: palette.draw(WORDS), 50)
+    im = IMWordle().draw(WORDS, raw_im=True)
+    bench("im2bytes (png)", lambda: im2bytes(im), 50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Micro-benchmark of `validate_word` against the previous tuple scan.
+
+Usage: python benchmarks/bench_validate.py
+"""
+
+import sys
+import timeit
+
+import _setup  # noqa: F401
+
+from nonebot_plugin_wordle_daily.util import get_word_index, validate_word
+from nonebot_plugin_wordle_daily.words import allowed, answers
+
+# the tuples the words used to be kept in
+Ma = tuple(answers)
+Oa = tuple(allowed)
+
+NUMBER = 2000
+
+CASES = {
+    "first answer": Ma[0],
+    "last allowed": Oa[-1],
+    "invalid": "zzzzz",
+}
+
+
+def tuple_lookup(word: str) -> bool:
+    return word in Ma or word in Oa
+
+
+def main() -> None:
+    for name, word in CASES.items():
+        old = min(timeit.repeat(lambda: tuple_lookup(word), number=NUMBER, repeat=5))
+        new = min(timeit.repeat(lambda: validate_word(word), number=NUMBER, repeat=5))
+        print(
+            f"{name:>14}: tuple {old / NUMBER * 1e6:8.2f}us"
+            f"  index {new / NUMBER * 1e6:6.2f}us  ({old / new:.1f}x)"
+        )
+    tuple_bytes = sys.getsizeof(Ma) + sys.getsizeof(Oa)
+    tuple_bytes += sum(sys.getsizeof(word) for word in Ma + Oa)
+    print(f"memory: tuple+str {tuple_bytes / 1024:.0f}KiB")
+    print(f"memory: index {get_word_index().nbytes / 1024:.0f}KiB")
+
+
+if __name__ == "__main__":
+    main()
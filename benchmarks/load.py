@@ -0,0 +1,120 @@
+"""End-to-end load test of the `wordle` matcher.
+
+Drives thousands of concurrent private sessions through nonebot's event
+handling with a fake OneBot V11 bot, whose API calls only sleep for
+`--api-latency`. Each session starts a game and guesses `--guesses` words,
+the handling time of every guess is recorded.
+
+Every waiting session is a temporary matcher which nonebot checks against
+each event, so the cost of a guess grows with the number of open sessions.
+
+Usage: python benchmarks/load.py --sessions 2000
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+import _setup  # noqa: F401
+import nonebot
+from nonebot.adapters.onebot.v11 import Adapter, Bot
+from nonebot.message import handle_event
+
+nonebot.get_driver().register_adapter(Adapter)
+nonebot.load_plugin("nonebot_plugin_wordle_daily")
+
+from nonebot_plugin_wordle_daily.util import get_answer  # noqa: E402
+from nonebot_plugin_wordle_daily.words import answers  # noqa: E402
+
+SELF_ID = "10000"
+_message_ids = itertools.count(1)
+
+
+class FakeBot(Bot):
+    """OneBot V11 bot whose API calls never leave the process."""
+
+    api_latency: float = 0.0
+    api_calls: int = 0
+
+    async def call_api(self, api: str, **data: Any) -> Any:
+        FakeBot.api_calls += 1
+        if self.api_latency:
+            await asyncio.sleep(self.api_latency)
+        return {"message_id": next(_message_ids)}
+
+
+def private_message(user_id: int, text: str) -> Dict[str, Any]:
+    return {
+        "time": int(time.time()),
+        "self_id": int(SELF_ID),
+        "post_type": "message",
+        "message_type": "private",
+        "sub_type": "friend",
+        "message_id": next(_message_ids),
+        "user_id": user_id,
+        "message": [{"type": "text", "data": {"text": text}}],
+        "raw_message": text,
+        "font": 0,
+        "sender": {"user_id": user_id, "nickname": str(user_id)},
+    }
+
+
+async def send(bot: Bot, user_id: int, text: str) -> float:
+    event = Adapter.json_to_event(private_message(user_id, text))
+    assert event is not None
+    start = time.perf_counter()
+    await handle_event(bot, event)
+    return time.perf_counter() - start
+
+
+async def play(bot: Bot, user_id: int, guesses: int, latencies: List[float]) -> None:
+    await send(bot, user_id, "/wordle")
+    answer = get_answer()
+    words = random.sample([word for word in answers if word != answer], guesses)
+    for word in words:
+        latencies.append(await send(bot, user_id, word))
+
+
+def percentile(data: List[float], q: float) -> float:
+    return data[min(len(data) - 1, int(len(data) * q))]
+
+
+async def main(args: argparse.Namespace) -> None:
+    driver = nonebot.get_driver()
+    adapter = next(iter(driver._adapters.values()))
+    bot = FakeBot(adapter, SELF_ID)
+    FakeBot.api_latency = args.api_latency
+    # run startup hooks such as opening the session store, the private
+    # lifespan is where nonebot keeps them since 2.2
+    lifespan = getattr(driver, "_lifespan", None)
+    if lifespan is not None:
+        await lifespan.startup()
+    latencies: List[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(play(bot, 100000 + i, args.guesses, latencies) for i in range(args.sessions))
+    )
+    elapsed = time.perf_counter() - start
+    if lifespan is not None:
+        await lifespan.shutdown()
+    latencies.sort()
+    print(f"sessions: {args.sessions}, guesses: {len(latencies)}")
+    print(f"elapsed: {elapsed:.2f}s, api calls: {FakeBot.api_calls}")
+    print(f"throughput: {len(latencies) / elapsed:.1f} guesses/s")
+    print(
+        f"latency: mean {statistics.mean(latencies) * 1e3:.1f}ms"
+        f"  p50 {percentile(latencies, 0.5) * 1e3:.1f}ms"
+        f"  p99 {percentile(latencies, 0.99) * 1e3:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--guesses", type=int, default=3, choices=range(1, 7))
+    parser.add_argument("--api-latency", type=float, default=0.0)
+    asyncio.run(main(parser.parse_args()))
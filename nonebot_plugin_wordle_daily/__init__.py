@@ -6,13 +6,14 @@ from nonebot import require
 require("nonebot_plugin_params")
 
 import asyncio
-from typing import Awaitable, Callable, Type
+from typing import Awaitable, Callable, List, Optional, Type
 
 from nonebot import get_driver, on_command
-from nonebot.adapters import MessageSegment
+from nonebot.adapters import Bot, Event, MessageSegment
 from nonebot.exception import SkippedException
 from nonebot.matcher import Matcher
 from nonebot.params import ArgStr, Depends
+from nonebot.permission import SUPERUSER, USER, Permission
 from nonebot_plugin_params import (
     ONEBOT,
     ImageSegmentMethod,
@@ -20,50 +21,270 @@ from nonebot_plugin_params import (
     is_private_message,
 )
 
-from . import deps
+from . import daily, deps, metrics
+from .config import Config
 from .deps import User
-from .image import IMWordle
-from .util import generate_share_msg, get_answer, validate_word
+from .image import get_atlas
+from .render import RenderExecutor
+from .reply import send_reply
+from .storage import SQLiteStore
+from .util import (
+    ImageEncoder,
+    generate_share_msg,
+    get_answer,
+    get_constraint_index,
+    get_word_index,
+    validate_word,
+)
+from .words import answers
+
+driver = get_driver()
+plugin_config = Config.parse_obj(driver.config.dict())
+daily.set_utc_offset(plugin_config.wordle_utc_offset)
+
+render_executor = RenderExecutor(
+    plugin_config.wordle_render_executor,
+    plugin_config.wordle_render_workers,
+    plugin_config.wordle_render_queue_size,
+    ImageEncoder(
+        plugin_config.wordle_image_format,
+        plugin_config.wordle_image_compress,
+        plugin_config.wordle_image_palette,
+    ),
+    plugin_config.wordle_board_cache_size,
+    plugin_config.wordle_canvas_count,
+)
+
+if plugin_config.wordle_pattern_matrix is not None:
+    from .solver import PatternMatrix
+
+    pattern_matrix: Optional["PatternMatrix"] = PatternMatrix(
+        plugin_config.wordle_pattern_matrix, get_word_index(), answers
+    )
+else:
+    pattern_matrix = None
+
+if plugin_config.wordle_storage == "sqlite":
+    deps.store = SQLiteStore(
+        plugin_config.wordle_storage_path,
+        plugin_config.wordle_storage_flush_interval,
+    )
+
+
+@daily.on_rollover
+def _(today: daily.Today) -> None:
+    render_executor.clear_cache()
+
+
+def _warm_up() -> None:
+    get_word_index()
+    get_constraint_index()
+    get_atlas(render_executor.tilesize)
+
+
+scheduler = daily.DailyScheduler(_warm_up)
+metrics.ACTIVE_SESSIONS.set_function(lambda: len(deps.users))
+_background_tasks: List["asyncio.Task[None]"] = []
+_metrics_server: Optional[asyncio.AbstractServer] = None
+
+
+@driver.on_startup
+async def _() -> None:
+    global _metrics_server
+    await deps.store.open()
+    day = daily.today().date
+    deps.stats.load(day, await deps.store.load_stats(day))
+    scheduler.start()
+    if plugin_config.wordle_metrics_file is not None:
+        _background_tasks.append(
+            asyncio.create_task(
+                metrics.write_periodically(
+                    plugin_config.wordle_metrics_file,
+                    plugin_config.wordle_metrics_interval,
+                )
+            )
+        )
+    if plugin_config.wordle_metrics_port is not None:
+        _metrics_server = await metrics.serve(
+            plugin_config.wordle_metrics_host, plugin_config.wordle_metrics_port
+        )
+
+
+@driver.on_shutdown
+async def _() -> None:
+    scheduler.stop()
+    for task in _background_tasks:
+        task.cancel()
+    if _metrics_server is not None:
+        _metrics_server.close()
+    render_executor.shutdown()
+    await deps.store.close()
+
+
+async def get_hint(user: User) -> str:
+    if pattern_matrix is None:
+        return "未启用提示功能"
+    loop = asyncio.get_running_loop()
+    with metrics.stage("hint"):
+        hint = await loop.run_in_executor(
+            None,
+            pattern_matrix.hint,
+            user.recv_words,
+            user.codes,
+            plugin_config.wordle_hard_mode,
+        )
+    return f"剩余 {hint.remaining} 个可能答案，建议猜: {hint.guess}"
+
+
+WAITER = "_wordle_waiter"
+
+
+async def next_word(matcher: Matcher, user: User, prompt: Optional[str] = None) -> None:
+    """Wait for the next word, unless another message did already.
+
+    A burst of messages may all run the matcher that was waiting. Only the
+    first of them to get here waits again, matchers of older tokens or left
+    waiting when the game ends no longer match, see the permission updater.
+    """
+    game_over = user.wins or user.finished
+    waits = not game_over and deps.is_waiter(user.user_id, matcher.state[WAITER])
+    if waits:
+        matcher.state[WAITER] = deps.wait(user.user_id)
+    if prompt is not None:
+        # after boards of earlier guesses still being sent
+        async with user.lock:
+            await matcher.send(prompt)
+    if waits:
+        await matcher.reject()
+    await matcher.finish()
+
+
+_command_starts = tuple(start for start in driver.config.command_start if start)
 
 wordle: Type[Matcher] = on_command(
     "wordle", rule=allow_adapters((ONEBOT,)) & is_private_message
 )
 
 
+@wordle.permission_updater
+async def _(event: Event, matcher: Matcher) -> Permission:
+    # not chained to `matcher.permission`, which checks the previous token
+    session = USER(event.get_session_id())
+    token = matcher.state[WAITER]
+
+    async def waiting(bot: Bot, event: Event) -> bool:
+        # a stale matcher must not take the message, it could not reply, and
+        # commands such as wordle.stats must reach their own matchers
+        return (
+            deps.is_waiter(event.get_user_id(), token)
+            and not event.get_plaintext().startswith(_command_starts)
+            and await session(bot, event)
+        )
+
+    return Permission(waiting)
+
+
 @wordle.handle()
 async def _(matcher: Matcher, user: User = Depends(deps.get_current_user)) -> None:
     if user.finished or user.wins:
         await matcher.finish("您已完成今日 Wordle")
+    matcher.state[WAITER] = deps.wait(user.user_id)
     if user.recv_words:
         await matcher.send("已恢复会话，输入单词继续游戏")
         raise SkippedException
-    await matcher.send("输入五字单词开始游戏")
+    await matcher.send("输入五字单词开始游戏，输入 hint 获取提示")
 
 
 @wordle.got("word")
 async def _(
+    bot: Bot,
+    event: Event,
     matcher: Matcher,
     word: str = ArgStr(),
     get_image_segment: Callable[..., Awaitable[MessageSegment]] = ImageSegmentMethod(),
     user: User = Depends(deps.get_current_user),
 ) -> None:
-    if len(word) != 5 or not word.isalpha():
-        await matcher.reject("输入五字单词")
-    elif not validate_word(word):
-        await matcher.reject("单词不合法")
-    user.recv_words.append(word)
-    img = await get_image_segment(IMWordle().draw(user.recv_words))
-    await matcher.send(img)
-    await asyncio.sleep(0.5)
+    if user.finished or user.wins:
+        # ended by an earlier message of the burst, which replies
+        await matcher.finish()
+    if word.lower() == "hint":
+        await next_word(matcher, user, await get_hint(user))
+    with metrics.stage("validate"):
+        valid = len(word) == 5 and word.isalpha()
+        known = valid and validate_word(word)
+        violation = (
+            user.constraints.violation(word)
+            if known and plugin_config.wordle_hard_mode
+            else None
+        )
+    if not valid:
+        await next_word(matcher, user, "输入五字单词")
+    elif not known:
+        await next_word(matcher, user, "单词不合法")
+    elif violation is not None:
+        await next_word(matcher, user, f"困难模式: {violation}")
+    user.add_word(word)
+    deps.save_user(user)
+    if user.wins or user.finished:
+        # matchers left waiting by earlier messages of the burst
+        deps.stop_waiting(user.user_id)
+    # later messages may add guesses while this one awaits, so the board and
+    # the reply only use the game as of this guess
+    words, codes = user.recv_words, list(user.codes)
+    guesses = len(codes)
+    ended = user.wins or user.finished
     if user.wins:
-        await matcher.send("您已胜利")
-        await matcher.finish(generate_share_msg(user.recv_words))
-    if not user.finished:
-        await matcher.reject()
+        deps.record_result(user)
+        texts = ["您已胜利", generate_share_msg(codes)]
+    elif user.finished:
+        deps.record_result(user)
+        texts = [f"全部猜错啦~ 答案是: {get_answer()}"]
     else:
-        await matcher.finish(f"全部猜错啦~ 答案是: {get_answer()}")
+        texts = [f"剩余 {user.constraints.remaining} 个可能的单词"]
+    async with user.lock:
+        if len(user.codes) != guesses:
+            # a later guess renders the board with this one on it
+            await next_word(matcher, user)
+        with metrics.stage("render"):
+            data = await render_executor.draw(words, codes, user.user_id)
+        if len(user.codes) != guesses:
+            # added while rendering, it renders next with this one on it
+            await next_word(matcher, user)
+        metrics.IMAGE_BYTES.observe(len(data))
+        img = await get_image_segment(data)
+        with metrics.stage("send"):
+            await send_reply(bot, event, img, texts)
+    if not ended:
+        await next_word(matcher, user)
+    # no more boards today, release the canvas
+    render_executor.release(user.user_id)
+    await matcher.finish()
 
 
-default_start = list(get_driver().config.command_start)[0]
+wordle_stats: Type[Matcher] = on_command(
+    ("wordle", "stats"), rule=allow_adapters((ONEBOT,)) & is_private_message
+)
+
+
+@wordle_stats.handle()
+async def _(matcher: Matcher, event: Event) -> None:
+    today = daily.today()
+    user_id = event.get_user_id()
+    await deps.load_streak(user_id)
+    await matcher.finish(deps.stats.summary(user_id, today.date, today.number))
+
+
+wordle_metrics: Type[Matcher] = on_command(("wordle", "metrics"), permission=SUPERUSER)
+
+
+@wordle_metrics.handle()
+async def _(matcher: Matcher) -> None:
+    await matcher.finish(metrics.summary())
+
+
+default_start = list(driver.config.command_start)[0]
 wordle.__help_name__ = "wordle"  # type: ignore
-wordle.__help_info__ = f"{default_start}wordle  # 开始今日的 Wordle 游戏"  # type: ignore
+wordle.__help_info__ = (  # type: ignore
+    f"{default_start}wordle  # 开始今日的 Wordle 游戏，游戏中输入 hint 获取提示\n"
+    f"{default_start}wordle.stats  # 查看今日统计和连胜榜"
+)
@@ -0,0 +1,45 @@
+from pathlib import Path
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+from .util import CompressPreset, ImageFormat
+
+
+class Config(BaseModel):
+    wordle_utc_offset: Optional[float] = None
+    """Hours from UTC of the timezone where days begin, default to local time."""
+    wordle_hard_mode: bool = False
+    """Guesses must reuse the greens in place and include the yellows found."""
+    wordle_render_executor: Literal["inline", "thread", "process"] = "thread"
+    """Where boards are rendered and encoded, `inline` runs on the event loop."""
+    wordle_render_workers: Optional[int] = None
+    """Worker count of the render pool, default by `concurrent.futures`."""
+    wordle_render_queue_size: int = 64
+    """Max renders running or waiting in the pool, further guesses wait."""
+    wordle_board_cache_size: int = 32 * 1024 * 1024
+    """Bytes of encoded boards shared across users, 0 disables the cache."""
+    wordle_canvas_count: int = 48
+    """Sessions keeping a canvas for incremental drawing, ~1MB each."""
+    wordle_image_format: ImageFormat = "png"
+    """Board image format: `png`, `webp` (lossless) or `jpeg`."""
+    wordle_image_compress: CompressPreset = "default"
+    """Encoder preset: `fast`, `default` or `small`."""
+    wordle_image_palette: bool = True
+    """Quantize png boards to the fixed wordle palette, smaller and faster."""
+    wordle_storage: Literal["memory", "sqlite"] = "memory"
+    """Session backend, `memory` loses games on restart."""
+    wordle_storage_path: Path = Path("data") / "wordle" / "sessions.db"
+    """Database file of the `sqlite` backend."""
+    wordle_storage_flush_interval: float = 5.0
+    """Seconds between batched writes of the `sqlite` backend."""
+    wordle_pattern_matrix: Optional[Path] = None
+    """Matrix from `scripts/wordle_patterns.py`, enables `hint` in games."""
+    wordle_metrics_file: Optional[Path] = None
+    """Write Prometheus metrics to this file periodically."""
+    wordle_metrics_interval: float = 15.0
+    """Seconds between writes of `wordle_metrics_file`."""
+    wordle_metrics_port: Optional[int] = None
+    """Serve Prometheus metrics over HTTP on this port."""
+    wordle_metrics_host: str = "127.0.0.1"
+    """Address of the metrics endpoint, local only by default."""
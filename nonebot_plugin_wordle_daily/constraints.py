@@ -0,0 +1,109 @@
+"""What the feedback so far says about the answer.
+
+`ConstraintIndex` keeps, for every position and letter, the set of answers
+with that letter there as bits of an int, and likewise the answers holding at
+least n copies of each letter. A session narrows its candidates by and-ing a
+few of these masks per guess, so counting the words left never rescans the
+word list. Only `answers` are indexed, other accepted words are never the
+answer.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+from .scoring import ABSENT, CORRECT, decode
+from .wordindex import WORD_LENGTH
+
+_ORD_A = ord("a")
+
+
+class ConstraintIndex:
+    __slots__ = ("all", "_positions", "_at_least")
+
+    def __init__(self, words: Sequence[str]) -> None:
+        self.all = (1 << len(words)) - 1
+        positions = [[0] * 26 for _ in range(WORD_LENGTH)]
+        # at_least[letter][n - 1], words with n or more copies of letter
+        at_least = [[0] * WORD_LENGTH for _ in range(26)]
+        for i, word in enumerate(words):
+            bit = 1 << i
+            counts = [0] * 26
+            for position, alpha in enumerate(word):
+                letter = ord(alpha) - _ORD_A
+                positions[position][letter] |= bit
+                counts[letter] += 1
+                at_least[letter][counts[letter] - 1] |= bit
+        self._positions = positions
+        self._at_least = at_least
+
+    def at(self, position: int, alpha: str) -> int:
+        """Words with `alpha` at `position`."""
+        return self._positions[position][ord(alpha) - _ORD_A]
+
+    def at_least(self, alpha: str, count: int) -> int:
+        """Words with at least `count` copies of `alpha`, 1 <= count."""
+        if count > WORD_LENGTH:
+            return 0
+        return self._at_least[ord(alpha) - _ORD_A][count - 1]
+
+
+class Constraints:
+    """Hints revealed to a session and the answers still consistent with them.
+
+    Updated by `add` after each guess, which costs a handful of big int
+    operations regardless of how many guesses came before.
+    """
+
+    __slots__ = ("index", "candidates", "greens", "min_counts")
+
+    def __init__(self, index: ConstraintIndex) -> None:
+        self.index = index
+        self.candidates = index.all
+        """Bits of the answers still possible."""
+        self.greens: Dict[int, str] = {}
+        """Letters known at each position."""
+        self.min_counts: Dict[str, int] = {}
+        """Copies of each letter known to be in the answer."""
+
+    @property
+    def remaining(self) -> int:
+        return bin(self.candidates).count("1")
+
+    def add(self, guess: str, code: int) -> None:
+        index = self.index
+        candidates = self.candidates
+        found: Dict[str, int] = {}
+        absent: List[str] = []
+        for position, (alpha, mark) in enumerate(zip(guess, decode(code))):
+            if mark == CORRECT:
+                candidates &= index.at(position, alpha)
+                self.greens[position] = alpha
+            else:
+                candidates &= ~index.at(position, alpha)
+            if mark == ABSENT:
+                absent.append(alpha)
+            else:
+                found[alpha] = found.get(alpha, 0) + 1
+        for alpha, count in found.items():
+            candidates &= index.at_least(alpha, count)
+            if count > self.min_counts.get(alpha, 0):
+                self.min_counts[alpha] = count
+        for alpha in absent:
+            # a gray copy caps the letter at the copies marked otherwise
+            candidates &= ~index.at_least(alpha, found.get(alpha, 0) + 1)
+        self.candidates = candidates
+
+    def violation(self, guess: str) -> Optional[str]:
+        """Why `guess` is refused in hard mode, None if it is allowed.
+
+        Hard mode requires reusing known letters: greens in place and other
+        found letters anywhere.
+        """
+        for position, alpha in sorted(self.greens.items()):
+            if guess[position] != alpha:
+                return f"第 {position + 1} 个字母必须是 {alpha.upper()}"
+        for alpha, count in self.min_counts.items():
+            if guess.count(alpha) < count:
+                if count == 1:
+                    return f"必须包含 {alpha.upper()}"
+                return f"必须包含 {count} 个 {alpha.upper()}"
+        return None
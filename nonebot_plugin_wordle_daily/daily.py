@@ -0,0 +1,116 @@
+"""Today's game state, computed once per day.
+
+Hot paths read the immutable `Today` snapshot from `today()`. A snapshot
+knows when it expires, so reading it never needs more than a float compare,
+and a new one is computed at the first read after midnight of the configured
+timezone. Side effects of a new day (evicting users, dropping caches) are
+registered with `on_rollover` and run by `DailyScheduler` on the event loop.
+"""
+
+import asyncio
+import time
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from types import MappingProxyType
+from typing import Callable, List, Mapping, NamedTuple, Optional
+
+from nonebot.log import logger
+
+from .scoring import answer_counts
+from .words import answers
+
+FIRST_DAY = date(2021, 6, 19)
+"""Day of the first wordle game, whose answer is `answers[0]`."""
+
+
+class Today(NamedTuple):
+    date: date
+    number: int
+    """Game number, also index of the answer in `answers`."""
+    answer: str
+    counts: Mapping[str, int]
+    """Letter counts of the answer, read by `scoring.score` for each guess."""
+    expires: float
+    """Timestamp of the next midnight."""
+
+
+_timezone: Optional[tzinfo] = None
+_today: Optional[Today] = None
+_rollover_callbacks: List[Callable[[Today], None]] = []
+
+
+def set_utc_offset(hours: Optional[float]) -> None:
+    """Set the timezone of day boundaries, None is the local time."""
+    global _timezone, _today
+    _timezone = None if hours is None else timezone(timedelta(hours=hours))
+    _today = None
+
+
+def _compute(now: datetime) -> Today:
+    day = now.date()
+    midnight = datetime.combine(day + timedelta(days=1), datetime.min.time())
+    if _timezone is not None:
+        midnight = midnight.replace(tzinfo=_timezone)
+    number = (day - FIRST_DAY).days
+    answer = answers[number]
+    return Today(
+        day,
+        number,
+        answer,
+        MappingProxyType(answer_counts(answer)),
+        # naive datetime converts as local time
+        midnight.timestamp(),
+    )
+
+
+def today() -> Today:
+    """Snapshot of the current day."""
+    global _today
+    snapshot = _today
+    if snapshot is None or time.time() >= snapshot.expires:
+        snapshot = _today = _compute(datetime.now(_timezone))
+    return snapshot
+
+
+def on_rollover(func: Callable[[Today], None]) -> Callable[[Today], None]:
+    """Run `func` with the new snapshot when a day begins."""
+    _rollover_callbacks.append(func)
+    return func
+
+
+class DailyScheduler:
+    """Wakes at each midnight to run the rollover callbacks.
+
+    `warm_up` runs at start and after each rollover, for caches that should
+    be filled before players arrive.
+    """
+
+    def __init__(self, warm_up: Optional[Callable[[], None]] = None) -> None:
+        self.warm_up = warm_up
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> None:
+        if self.warm_up is not None:
+            self.warm_up()
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        current = today()
+        while True:
+            await asyncio.sleep(max(current.expires - time.time(), 0) + 0.001)
+            snapshot = today()
+            if snapshot.date == current.date:
+                # woke early, clocks differ slightly between calls
+                continue
+            current = snapshot
+            for func in _rollover_callbacks:
+                try:
+                    func(snapshot)
+                except Exception as e:
+                    logger.opt(exception=e).error("Wordle rollover callback failed")
+            if self.warm_up is not None:
+                self.warm_up()
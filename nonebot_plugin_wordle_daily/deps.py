@@ -1,40 +1,196 @@
-from dataclasses import dataclass
+import asyncio
+import itertools
+from array import array
 from datetime import date
-from typing import Dict, List
+from typing import Dict, Iterable, List, Sequence
 
 from nonebot.adapters import Event
 from nonebot.matcher import Matcher
 
-from .util import get_answer
+from . import daily
+from .constraints import Constraints
+from .scoring import ALL_CORRECT, score
+from .stats import NO_STREAK, Stats, StreakRecord
+from .storage import MemoryStore, SessionRecord, SessionStore
+from .util import get_constraint_index
+from .wordindex import pack_word, unpack_word
 
 
-@dataclass
 class User:
-    user_id: str
-    recv_words: List[str]
-    date: date
+    """Wordle session of a user.
+
+    Guesses are kept as packed words (see `wordindex.pack_word`), 4 bytes each,
+    along with their feedback codes against today's answer and the
+    constraints those reveal.
+
+    Messages of a user may be handled concurrently. Checking and adding a
+    guess never awaits so it is atomic on the event loop, and boards are
+    rendered and replies sent under `lock`, in order. Which matcher may wait
+    for the next word is kept in `waiters`, apart from this object which may
+    be evicted and loaded again mid-game.
+    """
+
+    __slots__ = (
+        "user_id",
+        "date",
+        "recorded",
+        "constraints",
+        "lock",
+        "_guesses",
+        "_codes",
+    )
+
+    def __init__(
+        self,
+        user_id: str,
+        recv_words: Iterable[str],
+        date: date,
+        recorded: bool = False,
+    ) -> None:
+        self.user_id = user_id
+        self.date = date
+        self.recorded = recorded
+        """Whether the finished game is counted in `stats`."""
+        self.constraints = Constraints(get_constraint_index())
+        self.lock = asyncio.Lock()
+        self._guesses = array("I")
+        self._codes = array("B")
+        for word in recv_words:
+            self.add_word(word)
+
+    def __repr__(self) -> str:
+        return (
+            f"User(user_id={self.user_id!r}, recv_words={self.recv_words!r}, "
+            f"date={self.date!r})"
+        )
+
+    @property
+    def recv_words(self) -> List[str]:
+        """Received words, a new list on each access."""
+        return [unpack_word(code) for code in self._guesses]
+
+    @property
+    def codes(self) -> Sequence[int]:
+        """Feedback codes of received words, see `scoring`. Do not modify."""
+        return self._codes
+
+    def add_word(self, word: str) -> None:
+        today = daily.today()
+        code = score(word, today.answer, today.counts)
+        self._guesses.append(pack_word(word))
+        self._codes.append(code)
+        self.constraints.add(word, code)
+
+    def reset(self, today: date) -> None:
+        self.date = today
+        self.recorded = False
+        del self._guesses[:]
+        del self._codes[:]
+        self.constraints = Constraints(self.constraints.index)
 
     @property
     def finished(self) -> bool:
-        return len(self.recv_words) >= 6
+        return len(self._guesses) >= 6
 
     @property
     def wins(self) -> bool:
-        if not self.recv_words:
+        if not self._codes:
             return False
-        return self.recv_words[-1] == get_answer()
+        return self._codes[-1] == ALL_CORRECT
 
 
 users: Dict[str, User] = {}
-# simple database
-# or OnFocus
+# resident users, backed by `store`
+store: SessionStore = MemoryStore()
+# replaced by the configured backend in plugin setup
+stats = Stats(date.min)
+# counters of finished games, streaks are loaded along with `users`
+waiters: Dict[str, int] = {}
+# token of the matcher allowed to wait for the next word of each user
+_tokens = itertools.count(1)
+
+
+def wait(user_id: str) -> int:
+    """Token of a new matcher waiting for the user, older tokens expire."""
+    token = waiters[user_id] = next(_tokens)
+    return token
+
+
+def is_waiter(user_id: str, token: int) -> bool:
+    """Whether the matcher holding `token` may wait for the user."""
+    return waiters.get(user_id) == token
+
+
+def stop_waiting(user_id: str) -> None:
+    """Expire every token of the user, call when the game ends."""
+    waiters.pop(user_id, None)
+
+
+def save_user(user: User) -> None:
+    """Hand the user state to `store`, call after every change."""
+    store.save(user.user_id, SessionRecord(user.date, user.recv_words, user.recorded))
+
+
+async def load_streak(user_id: str) -> StreakRecord:
+    """Streak of the user, from `stats` if resident or else from `store`."""
+    streak = stats.streaks.get(user_id)
+    if streak is None:
+        loaded = await store.load_streak(user_id)
+        # another handler may have loaded it while awaiting
+        streak = stats.streaks.setdefault(user_id, loaded or NO_STREAK)
+    return streak
+
+
+def record_result(user: User) -> None:
+    """Count the finished game of the user in `stats`, only once per game."""
+    if user.recorded:
+        return
+    user.recorded = True
+    streak = stats.record(user.user_id, user.date, len(user.codes), user.wins)
+    store.save_stats(
+        user.date, stats.day.histogram, stats.leaderboard, user.user_id, streak
+    )
+    save_user(user)
+
+
+def sweep_users(today: date) -> int:
+    """Evict users not playing `today`, returns the evicted count.
+
+    Their state and streaks are already handed to `store`. The dict is
+    rebuilt because dicts never shrink on deletion. Runs on each day rollover.
+    """
+    global users
+    count = len(users)
+    users = {user_id: user for user_id, user in users.items() if user.date == today}
+    for user_id in list(waiters):
+        if user_id not in users:
+            del waiters[user_id]
+    stats.retain(users)
+    return count - len(users)
+
+
+@daily.on_rollover
+def _(today: daily.Today) -> None:
+    sweep_users(today.date)
+    stats.rollover(today.date)
 
 
 async def get_current_user(matcher: Matcher, event: Event) -> User:
+    today = daily.today().date
     user_id = event.get_user_id()
-    # implicit register
-    user = users.setdefault(user_id, User(user_id, [], date.today()))
-    if user.date != date.today():
-        user.date = date.today()
-        user.recv_words.clear()
+    user = users.get(user_id)
+    if user is None:
+        # lazy load, implicit register if never stored
+        record = await store.load(user_id)
+        if record is None:
+            record = SessionRecord(today, [])
+        # needed by `record_result`, which must not await
+        await load_streak(user_id)
+        # another handler may have loaded it while awaiting
+        user = users.setdefault(
+            user_id, User(user_id, record.recv_words, record.date, record.recorded)
+        )
+    if user.date != today:
+        user.reset(today)
+        save_user(user)
     return user
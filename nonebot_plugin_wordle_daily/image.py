@@ -1,11 +1,15 @@
 import itertools
+from functools import lru_cache
 from pathlib import Path
 from typing import (
+    Dict,
     Generic,
     Iterable,
     List,
     Literal,
+    NamedTuple,
     Optional,
+    Sequence,
     Tuple,
     TypeVar,
     Union,
@@ -14,15 +18,38 @@ from typing import (
 
 from PIL import Image, ImageDraw, ImageFont, ImageOps
 
-from .util import get_answer, im2bytes
+from .metrics import CACHE_REQUESTS, stage
+from .scoring import ABSENT, CORRECT, PRESENT, decode, score
+from .util import ImageEncoder, get_answer
 
 T = TypeVar("T")
 
 FONT_NAME = str(Path(__file__).parent / "assets" / "ClearSans-Bold.ttf")
 
-clearsans_bold_13 = ImageFont.truetype(FONT_NAME, 13)
-clearsans_bold_16 = ImageFont.truetype(FONT_NAME, 16)
-clearsans_bold_32 = ImageFont.truetype(FONT_NAME, 32)
+
+@lru_cache(maxsize=None)
+def get_font(size: int) -> ImageFont.FreeTypeFont:
+    """ClearSans Bold in `size`, opened on first use."""
+    return ImageFont.truetype(FONT_NAME, size)
+
+
+COLOR_CORRECT = "#6aaa64"
+COLOR_PRESENT = "#c9b458"
+COLOR_ABSENT = "#787c7e"
+COLOR_EMPTY_OUTLINE = "#d3d6da"
+COLOR_KEY = "#d3d6da"
+
+_atlas_hit = CACHE_REQUESTS.labels("atlas", "hit")
+_atlas_miss = CACHE_REQUESTS.labels("atlas", "miss")
+
+UNKNOWN = -1
+"""Mark of keys whose letter is not guessed yet, lower than any other mark."""
+
+MARK_COLORS = {
+    CORRECT: COLOR_CORRECT,
+    PRESENT: COLOR_PRESENT,
+    ABSENT: COLOR_ABSENT,
+}
 
 
 class NDArray(Generic[T]):
@@ -202,106 +229,300 @@ class NDArray(Generic[T]):
             )
 
 
+class TileAtlas:
+    """Sprites of gameboard tiles in one tilesize.
+
+    Each (letter, colour) tile is rendered on first use and reused afterwards,
+    so at most 26 * 3 letter tiles and the empty tile are ever drawn. Sprites
+    are shared, do not draw on them.
+    """
+
+    tilesize: int
+    empty: Image.Image
+
+    def __init__(self, tilesize: int) -> None:
+        self.tilesize = tilesize
+        self.empty = Image.new("RGB", (tilesize, tilesize), color="white")
+        ImageDraw.Draw(self.empty).rectangle(
+            ((0, 0), (tilesize - 1, tilesize - 1)),
+            outline=COLOR_EMPTY_OUTLINE,
+            width=2,
+        )
+        self._tiles: Dict[Tuple[str, str], Image.Image] = {}
+
+    def get(self, alpha: str, fill: str) -> Image.Image:
+        tile = self._tiles.get((alpha, fill))
+        if tile is None:
+            _atlas_miss.inc()
+            tile = self._tiles[(alpha, fill)] = self._render(alpha, fill)
+        else:
+            _atlas_hit.inc()
+        return tile
+
+    def _render(self, alpha: str, fill: str) -> Image.Image:
+        im = Image.new("RGB", (self.tilesize, self.tilesize), color="white")
+        imdraw = ImageDraw.Draw(im)
+        imdraw.rectangle(
+            ((0, 0), (self.tilesize - 1, self.tilesize - 1)),
+            fill=fill,
+        )
+        # alpha is upper, so not need to calculate its true height
+        # just give anchor "mm"
+        imdraw.text(
+            (self.tilesize / 2, self.tilesize / 2),
+            alpha.upper(),
+            font=get_font(32),
+            anchor="mm",
+        )
+        return im
+
+
+@lru_cache(maxsize=8)
+def get_atlas(tilesize: int) -> TileAtlas:
+    """Get the shared `TileAtlas` of `tilesize`, keeps the latest 8 sizes."""
+    return TileAtlas(tilesize)
+
+
+BOARD_MARGIN = 10
+TILE_GAP = 5
+
+
+@lru_cache(maxsize=8)
+def _blank_gameboard(tilesize: int) -> Image.Image:
+    """Gameboard filled with empty tiles, margin included. Do not draw on it."""
+    atlas = get_atlas(tilesize)
+    gameboard = Image.new(
+        "RGB", (5 * tilesize + 4 * TILE_GAP, 6 * tilesize + 5 * TILE_GAP), "white"
+    )
+    for x, y in itertools.product(range(5), range(6)):
+        gameboard.paste(
+            atlas.empty, (x * (tilesize + TILE_GAP), y * (tilesize + TILE_GAP))
+        )
+    return ImageOps.expand(gameboard, border=BOARD_MARGIN, fill="white")
+
+
+KEYBOARD_ROWS = ("qwertyuiop", "asdfghjkl", "zxcvbnm")
+KEYBOARD_SIZE = (500, 200)
+KEY_SIZE = (43, 58)
+KEY_GAP = (6, 8)
+
+
+def _key_positions() -> Dict[str, Tuple[int, int]]:
+    positions = {}
+    height = len(KEYBOARD_ROWS) * (KEY_SIZE[1] + KEY_GAP[1]) - KEY_GAP[1]
+    y = (KEYBOARD_SIZE[1] - height) // 2
+    for row in KEYBOARD_ROWS:
+        width = len(row) * (KEY_SIZE[0] + KEY_GAP[0]) - KEY_GAP[0]
+        x = (KEYBOARD_SIZE[0] - width) // 2
+        for alpha in row:
+            positions[alpha] = (x, y)
+            x += KEY_SIZE[0] + KEY_GAP[0]
+        y += KEY_SIZE[1] + KEY_GAP[1]
+    return positions
+
+
+KEY_POSITIONS = _key_positions()
+"""Top-left corner of each key in the keyboard."""
+
+
+@lru_cache(maxsize=len(MARK_COLORS) * 26 + 26)
+def _key_sprite(alpha: str, mark: int) -> Image.Image:
+    """Key of `alpha` coloured by its best mark. Do not draw on it."""
+    im = Image.new("RGB", KEY_SIZE, color="white")
+    imdraw = ImageDraw.Draw(im)
+    imdraw.rounded_rectangle(
+        ((0, 0), (KEY_SIZE[0] - 1, KEY_SIZE[1] - 1)),
+        radius=4,
+        fill=MARK_COLORS.get(mark, COLOR_KEY),
+    )
+    imdraw.text(
+        (KEY_SIZE[0] / 2, KEY_SIZE[1] / 2),
+        alpha.upper(),
+        fill="black" if mark == UNKNOWN else "white",
+        font=get_font(16),
+        anchor="mm",
+    )
+    return im
+
+
+@lru_cache(maxsize=1)
+def _blank_keyboard() -> Image.Image:
+    keyboard = Image.new("RGB", KEYBOARD_SIZE, color="white")
+    for alpha, position in KEY_POSITIONS.items():
+        keyboard.paste(_key_sprite(alpha, UNKNOWN), position)
+    return keyboard
+
+
+class _Layout(NamedTuple):
+    size: Tuple[int, int]
+    board: Tuple[int, int]
+    keyboard: Tuple[int, int]
+
+
+@lru_cache(maxsize=8)
+def _layout(tilesize: int) -> _Layout:
+    """Canvas size and offsets of the gameboard and the keyboard under it."""
+    board_width, board_height = _blank_gameboard(tilesize).size
+    width = max(board_width, KEYBOARD_SIZE[0] + 2 * BOARD_MARGIN)
+    return _Layout(
+        (width, board_height + KEYBOARD_SIZE[1] + BOARD_MARGIN),
+        ((width - board_width) // 2, 0),
+        ((width - KEYBOARD_SIZE[0]) // 2, board_height),
+    )
+
+
+@lru_cache(maxsize=8)
+def _blank_canvas(tilesize: int) -> Image.Image:
+    """Empty gameboard above a keyboard of unknown keys. Do not draw on it."""
+    layout = _layout(tilesize)
+    canvas = Image.new("RGB", layout.size, color="white")
+    canvas.paste(_blank_gameboard(tilesize), layout.board)
+    canvas.paste(_blank_keyboard(), layout.keyboard)
+    return canvas
+
+
+class BoardCanvas:
+    """Last gameboard and keyboard painted for a session.
+
+    `IMWordle.draw` paints only the rows added since the previous call onto
+    this canvas, and only the keys whose best mark changed. It starts over by
+    itself when the answer or tilesize changes or when there are fewer words
+    than painted rows, and `reset` drops it.
+    """
+
+    __slots__ = ("answer", "tilesize", "image", "rows", "keys")
+
+    answer: Optional[str]
+    tilesize: int
+    image: Optional[Image.Image]
+    rows: int
+    keys: Dict[str, int]
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.answer = None
+        self.tilesize = 0
+        self.image = None
+        self.rows = 0
+        self.keys = {}
+
+
 class IMWordle:
     """Painter for wordle game.
 
     This create flexible image of wordle gameboard by given `tilesize` parameter.
 
     The gameboard is composed using tiles with absolute gap(5px).
-    The keyboard is fixed size(500x200).
+    The keyboard is fixed size(500x200) and placed under the gameboard.
 
     Args:
-        answer: wordle game answer
         tilesize: tile size in wordle gameboard, give 62 is equal to give (62,62)
+        answer: wordle game answer, default to today's answer
+        encoder: encoder of `draw` output, default to png
     """
 
     tilesize: int
-    current_gameboard: Optional[Image.Image]
-    current_keyboard: Optional[Image.Image]
+    encoder: ImageEncoder
 
-    def __init__(self, tilesize: int = 62) -> None:
+    def __init__(
+        self,
+        tilesize: int = 62,
+        answer: Optional[str] = None,
+        encoder: Optional[ImageEncoder] = None,
+    ) -> None:
         self.tilesize = tilesize
-        self.current_gameboard = None
-        self.current_keyboard = None
+        self._answer = answer
+        self.encoder = encoder or ImageEncoder()
 
     @property
     def answer(self) -> str:
-        return get_answer()
-
-    def get_tiles(self, chars: Iterable[Union[str, None]]) -> Iterable[Image.Image]:
-        imempty = Image.new("RGB", (self.tilesize, self.tilesize), color="white")
-        ImageDraw.Draw(imempty).rectangle(
-            ((0, 0), (self.tilesize - 1, self.tilesize - 1)), outline="#d3d6da", width=2
-        )
-        itor_alpha = iter(chars)
-        answer = self.answer
-        index = 0
-        while True:
-            try:
-                alpha = next(itor_alpha)
-                alpha_val = answer[index % 5]
-                index += 1
-            except StopIteration:
-                return
-            else:
-                if alpha is None or alpha == "0":
-                    yield imempty
-                    continue
-                im = Image.new("RGB", (self.tilesize, self.tilesize), color="white")
-                imdraw = ImageDraw.Draw(im)
-                if alpha == alpha_val:
-                    fill = "#6aaa64"
-                elif alpha in answer:
-                    fill = "#c9b458"
-                else:
-                    fill = "#787c7e"
-                imdraw.rectangle(
-                    ((0, 0), (self.tilesize - 1, self.tilesize - 1)),
-                    fill=fill,
-                )
-                # alpha is upper, so not need to calculate its true height
-                # just give anchor "mm"
-                imdraw.text(
-                    (self.tilesize / 2, self.tilesize / 2),
-                    alpha.upper(),
-                    font=clearsans_bold_32,
-                    anchor="mm",
-                )
-                yield im
+        """Given answer, or today's answer by default."""
+        if self._answer is None:
+            return get_answer()
+        return self._answer
+
+    def get_tiles(self, word: str, code: Optional[int] = None) -> Iterable[Image.Image]:
+        """Tiles of a guessed word, `code` is its feedback if already scored."""
+        atlas = get_atlas(self.tilesize)
+        if code is None:
+            code = score(word, self.answer)
+        for alpha, mark in zip(word, decode(code)):
+            yield atlas.get(alpha, MARK_COLORS[mark])
 
     @overload
-    def draw(self, words: List[str], raw_im: Literal[False] = False) -> bytes:
+    def draw(
+        self,
+        words: List[str],
+        raw_im: Literal[False] = False,
+        canvas: Optional[BoardCanvas] = None,
+        codes: Optional[Sequence[int]] = None,
+    ) -> bytes:
         ...
 
     @overload
-    def draw(self, words: List[str], raw_im: Literal[True]) -> Image.Image:
+    def draw(
+        self,
+        words: List[str],
+        raw_im: Literal[True],
+        canvas: Optional[BoardCanvas] = None,
+        codes: Optional[Sequence[int]] = None,
+    ) -> Image.Image:
         ...
 
-    def draw(self, words: List[str], raw_im: bool = False) -> Union[Image.Image, bytes]:
-        gameboard = Image.new(
-            "RGB", (5 * self.tilesize + 20, 6 * self.tilesize + 25), color="white"
-        )
-        alpha_arr = NDArray.from_iterable(words)
-        for index, im in NDArray(
-            self.get_tiles(
-                itertools.chain(
-                    alpha_arr.flat, itertools.repeat(None, 30 - alpha_arr.size)
-                )
-            ),
-            shape=(6, 5),
-        ).enumerate():
-            gameboard.paste(
-                im, (index[0] * (self.tilesize + 5), index[1] * (self.tilesize + 5))
-            )
-        gameboard = ImageOps.expand(gameboard, border=10, fill="white")
-        # if with keyboard, then expand to (500 - gameboard.size[0], ...)
-        self.current_gameboard = gameboard
-
-        keyboard = Image.new("RGB", (500, 200))
-        self.current_keyboard = keyboard
-        for word in words:
-            ...
-        # Combine and add margin
+    def draw(
+        self,
+        words: List[str],
+        raw_im: bool = False,
+        canvas: Optional[BoardCanvas] = None,
+        codes: Optional[Sequence[int]] = None,
+    ) -> Union[Image.Image, bytes]:
+        """Draw the gameboard of `words`.
+
+        `codes` are feedback codes of `words` if already scored, and `canvas`
+        keeps the board between calls to paint only new rows.
+        """
+        with stage("draw"):
+            if canvas is None:
+                canvas = BoardCanvas()
+            answer = self.answer
+            if (
+                canvas.image is None
+                or canvas.answer != answer
+                or canvas.tilesize != self.tilesize
+                or canvas.rows > len(words)
+            ):
+                canvas.reset()
+                canvas.answer = answer
+                canvas.tilesize = self.tilesize
+                canvas.image = _blank_canvas(self.tilesize).copy()
+            image = canvas.image
+            layout = _layout(self.tilesize)
+            board_x, board_y = layout.board
+            keyboard_x, keyboard_y = layout.keyboard
+            step = self.tilesize + TILE_GAP
+            for y in range(canvas.rows, len(words)):
+                word = words[y]
+                code = codes[y] if codes is not None else score(word, answer)
+                for x, im in enumerate(self.get_tiles(word, code)):
+                    image.paste(
+                        im,
+                        (
+                            board_x + BOARD_MARGIN + x * step,
+                            board_y + BOARD_MARGIN + y * step,
+                        ),
+                    )
+                for alpha, mark in zip(word, decode(code)):
+                    if mark > canvas.keys.get(alpha, UNKNOWN):
+                        canvas.keys[alpha] = mark
+                        key_x, key_y = KEY_POSITIONS[alpha]
+                        image.paste(
+                            _key_sprite(alpha, mark),
+                            (keyboard_x + key_x, keyboard_y + key_y),
+                        )
+            canvas.rows = len(words)
         if raw_im:
-            return gameboard
-        return im2bytes(gameboard)
+            return image.copy()
+        with stage("encode"):
+            return self.encoder(image)
@@ -0,0 +1,326 @@
+"""Minimal in-process metrics in Prometheus text format.
+
+Metrics are plain counters behind dict lookups so that they are cheap enough
+for every guess. Those recorded inside render processes stay there.
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from pathlib import Path
+from types import TracebackType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from nonebot.log import logger
+
+T = TypeVar("T")
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric(ABC, Generic[T]):
+    type: str
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], T] = {}
+
+    @abstractmethod
+    def _new_child(self) -> T:
+        raise NotImplementedError
+
+    def labels(self, *values: str) -> T:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def children(self) -> Iterator[Tuple[Tuple[str, ...], T]]:
+        return iter(list(self._children.items()))
+
+    @abstractmethod
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Counter(_Metric[CounterValue]):
+    type = "counter"
+
+    def _new_child(self) -> CounterValue:
+        return CounterValue()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in self.children():
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}{labels} {child.value}"
+
+
+class Gauge(_Metric[Callable[[], float]]):
+    """Gauge read from a function at export time."""
+
+    type = "gauge"
+
+    def _new_child(self) -> Callable[[], float]:
+        return lambda: 0.0
+
+    def set_function(self, func: Callable[[], float], *labels: str) -> None:
+        self.labels(*labels)  # validate
+        self._children[labels] = func
+
+    def _samples(self) -> Iterator[str]:
+        for values, func in self.children():
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}{labels} {func()}"
+
+
+class HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        # counts[i] is observations in (buckets[i-1], buckets[i]], last is +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the `q` quantile."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class _Timer:
+    __slots__ = ("_value", "_start")
+
+    def __init__(self, value: HistogramValue) -> None:
+        self._value = value
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self._value.observe(time.perf_counter() - self._start)
+
+
+class Histogram(_Metric[HistogramValue]):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramValue:
+        return HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in self.children():
+            cumulative = 0
+            bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, child.counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames + ("le",), values + (bound,))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {child.sum}"
+            yield f"{self.name}_count{labels} {child.count}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric[Any]] = {}
+
+    def register(self, metric: _Metric[Any]) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """All metrics in Prometheus text format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    metric = Counter(name, documentation, labelnames)
+    registry.register(metric)
+    return metric
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    metric = Gauge(name, documentation, labelnames)
+    registry.register(metric)
+    return metric
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    metric = Histogram(name, documentation, labelnames, buckets)
+    registry.register(metric)
+    return metric
+
+
+STAGE_SECONDS = histogram(
+    "wordle_stage_seconds", "Time spent per stage of the wordle handlers.", ["stage"]
+)
+CACHE_REQUESTS = counter(
+    "wordle_cache_requests_total", "Cache lookups by result.", ["cache", "result"]
+)
+IMAGE_BYTES = histogram(
+    "wordle_image_bytes",
+    "Size of encoded board images.",
+    buckets=(1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072),
+)
+ACTIVE_SESSIONS = gauge("wordle_active_sessions", "Resident wordle sessions.")
+
+
+def stage(name: str) -> _Timer:
+    """Time a `with` block as stage `name`."""
+    return STAGE_SECONDS.labels(name).time()
+
+
+def cache_hit_rate(cache: str) -> Optional[float]:
+    hits = CACHE_REQUESTS.labels(cache, "hit").value
+    misses = CACHE_REQUESTS.labels(cache, "miss").value
+    if not hits + misses:
+        return None
+    return hits / (hits + misses)
+
+
+def summary() -> str:
+    """Human readable summary for the admin command."""
+    lines: List[str] = []
+    for (name,), value in STAGE_SECONDS.children():
+        if value.count:
+            lines.append(
+                f"{name}: {value.count} 次, 平均 {value.sum / value.count * 1e3:.1f}ms,"
+                f" p99 <= {value.quantile(0.99) * 1e3:g}ms"
+            )
+    for (cache, result), _ in CACHE_REQUESTS.children():
+        if result == "hit":
+            rate = cache_hit_rate(cache)
+            if rate is not None:
+                lines.append(f"{cache} 缓存命中率: {rate:.1%}")
+    image = IMAGE_BYTES.labels()
+    if image.count:
+        lines.append(f"图片: {image.count} 张, 平均 {image.sum / image.count:.0f} 字节")
+    for _, func in ACTIVE_SESSIONS.children():
+        lines.append(f"活跃会话: {func():.0f}")
+    return "\n".join(lines) or "暂无数据"
+
+
+async def write_periodically(path: Path, interval: float) -> None:
+    """Write `registry` to `path` every `interval` seconds, atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            tmp.write_text(registry.render(), encoding="utf-8")
+            tmp.replace(path)
+        except OSError as e:
+            logger.opt(exception=e).error("Failed to write wordle metrics")
+
+
+async def _handle_scrape(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    try:
+        # any request gets the metrics, the request itself is ignored
+        await reader.readuntil(b"\r\n\r\n")
+        body = registry.render().encode()
+        writer.write(
+            b"HTTP/1.0 200 OK\r\n"
+            b"Content-Type: text/plain; version=0.0.4\r\n"
+            b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+        )
+        await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, OSError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int) -> asyncio.AbstractServer:
+    """Serve `registry` over plain HTTP for Prometheus scrapes."""
+    return await asyncio.start_server(_handle_scrape, host, port)
@@ -0,0 +1,216 @@
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Hashable, List, Literal, Optional, Sequence, TypeVar
+
+from .image import BoardCanvas, IMWordle
+from .metrics import CACHE_REQUESTS
+from .util import ImageEncoder, get_answer
+
+T = TypeVar("T")
+
+ExecutorKind = Literal["inline", "thread", "process"]
+
+
+def draw_board(
+    words: List[str],
+    codes: List[int],
+    tilesize: int,
+    answer: str,
+    encoder: ImageEncoder,
+) -> bytes:
+    """Render and encode a full gameboard. Top-level so it pickles to workers."""
+    return IMWordle(tilesize, answer, encoder).draw(words, codes=codes)
+
+
+_board_hit = CACHE_REQUESTS.labels("board", "hit")
+_board_miss = CACHE_REQUESTS.labels("board", "miss")
+
+
+class BoardCache:
+    """LRU cache of encoded boards, bounded by total bytes.
+
+    Players share the daily answer and often the first guesses, so the same
+    board is requested by many users. Only used from the event loop.
+    """
+
+    max_bytes: int
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._data: "OrderedDict[Hashable, bytes]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        data = self._data.get(key)
+        if data is None:
+            _board_miss.inc()
+            return None
+        _board_hit.inc()
+        self._data.move_to_end(key)
+        return data
+
+    def put(self, key: Hashable, data: bytes) -> None:
+        if len(data) > self.max_bytes or key in self._data:
+            return
+        self._data[key] = data
+        self.nbytes += len(data)
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._data.popitem(last=False)
+            self.nbytes -= len(evicted)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.nbytes = 0
+
+
+class CanvasPool:
+    """Canvases of the sessions drawn most recently, at most `max_count`.
+
+    A canvas holds a full RGB board, ~1MB at the default tilesize, so
+    sessions left idle must not keep one each. A session whose canvas was
+    evicted is drawn in full once and then incrementally again. Only used
+    from the event loop.
+    """
+
+    max_count: int
+
+    def __init__(self, max_count: int) -> None:
+        self.max_count = max_count
+        self._canvases: "OrderedDict[Hashable, BoardCanvas]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._canvases)
+
+    def get(self, key: Hashable) -> BoardCanvas:
+        """Canvas of session `key`, a blank one if it has none."""
+        canvas = self._canvases.get(key)
+        if canvas is not None:
+            self._canvases.move_to_end(key)
+            return canvas
+        canvas = BoardCanvas()
+        if self.max_count > 0:
+            self._canvases[key] = canvas
+            while len(self._canvases) > self.max_count:
+                self._canvases.popitem(last=False)
+        return canvas
+
+    def discard(self, key: Hashable) -> None:
+        self._canvases.pop(key, None)
+
+    def clear(self) -> None:
+        self._canvases.clear()
+
+
+class RenderExecutor:
+    """Runs synchronous Pillow work away from the event loop.
+
+    `inline` calls the function directly. `thread` and `process` submit it to
+    a pool, at most `max_pending` calls are running or queued in the pool and
+    callers beyond that wait for a slot.
+
+    In-process renders paint onto the session's canvas from a `CanvasPool` of
+    `canvas_count`. Process workers do not share memory with the bot, so
+    boards are drawn in full there.
+
+    Encoded boards are kept in a `BoardCache` of `cache_bytes` and served from
+    it without rendering, 0 disables the cache. Boards of an old answer are
+    never requested again, `clear_cache` drops them and the canvases on day
+    rollover.
+    """
+
+    kind: ExecutorKind
+    max_workers: Optional[int]
+    max_pending: int
+    encoder: ImageEncoder
+    tilesize: int
+    cache: Optional[BoardCache]
+    canvases: CanvasPool
+
+    def __init__(
+        self,
+        kind: ExecutorKind,
+        max_workers: Optional[int] = None,
+        max_pending: int = 64,
+        encoder: Optional[ImageEncoder] = None,
+        cache_bytes: int = 0,
+        canvas_count: int = 48,
+    ) -> None:
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.kind = kind
+        self.encoder = encoder or ImageEncoder()
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.tilesize = 62
+        self.cache = BoardCache(cache_bytes) if cache_bytes > 0 else None
+        self.canvases = CanvasPool(canvas_count)
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="wordle-render"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[[], T]) -> T:
+        if self.kind == "inline":
+            return func()
+        if self._slots is None:
+            # created lazily to bind the running loop
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func)
+
+    async def draw(
+        self, words: List[str], codes: Sequence[int], session: Hashable
+    ) -> bytes:
+        """Render the encoded gameboard of `words` scored as `codes`.
+
+        Draws of one `session` must not run concurrently, they share a canvas.
+        """
+        words, codes = list(words), list(codes)
+        answer = get_answer()
+        key = None
+        if self.cache is not None:
+            key = (answer, tuple(words), self.tilesize, self.encoder.key)
+            data = self.cache.get(key)
+            if data is not None:
+                return data
+        if self.kind == "process":
+            data = await self.run(
+                partial(draw_board, words, codes, self.tilesize, answer, self.encoder)
+            )
+        else:
+            painter = IMWordle(self.tilesize, answer, self.encoder)
+            canvas = self.canvases.get(session)
+            data = await self.run(
+                partial(painter.draw, words, canvas=canvas, codes=codes)
+            )
+        if self.cache is not None:
+            self.cache.put(key, data)
+        return data
+
+    def release(self, session: Hashable) -> None:
+        """Drop the canvas of a session that draws no more boards."""
+        self.canvases.discard(session)
+
+    def clear_cache(self) -> None:
+        if self.cache is not None:
+            self.cache.clear()
+        self.canvases.clear()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
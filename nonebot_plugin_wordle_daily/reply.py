@@ -0,0 +1,30 @@
+"""Replies made of a board image and some status text.
+
+Adapters in `MIXED_MESSAGE_ADAPTERS` take an image and text in one message,
+so a reply is a single API call. Others get one message per part, sent in
+order. Callers hold the session's `User.lock` while replying, which keeps
+replies of a session from interleaving without pausing between them.
+"""
+
+from typing import Sequence
+
+from nonebot.adapters import Bot, Event, Message, MessageSegment
+
+MIXED_MESSAGE_ADAPTERS = frozenset({"OneBot V11", "OneBot V12"})
+
+
+async def send_reply(
+    bot: Bot, event: Event, image: MessageSegment, texts: Sequence[str]
+) -> None:
+    """Send the image and texts as one message if the adapter can."""
+    if bot.adapter.get_name() in MIXED_MESSAGE_ADAPTERS:
+        await bot.send(event, compose(image, texts))
+        return
+    await bot.send(event, image)
+    for text in texts:
+        await bot.send(event, text)
+
+
+def compose(image: MessageSegment, texts: Sequence[str]) -> Message:
+    """The image followed by the texts, one per line."""
+    return image + "\n".join(texts)
@@ -0,0 +1,59 @@
+"""Wordle feedback of a guess against the answer.
+
+Feedback is encoded as a base-3 integer, the mark of letter `i` is the digit
+of weight `3 ** i`. So there are 243 codes and `ALL_CORRECT` (242) wins.
+"""
+
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+ABSENT = 0
+PRESENT = 1
+CORRECT = 2
+
+ALL_CORRECT = 242
+CODE_COUNT = 243
+
+
+@lru_cache(maxsize=2)
+def answer_counts(answer: str) -> Dict[str, int]:
+    """Letter counts of `answer`, computed once per answer. Do not modify."""
+    return dict(Counter(answer))
+
+
+def score(guess: str, answer: str, counts: Optional[Mapping[str, int]] = None) -> int:
+    """Feedback code of `guess`, repeated letters are marked as wordle does.
+
+    Correct letters are marked first, then other letters are marked present
+    from left to right while the answer still has unmarked copies of them.
+    `counts` are the letter counts of `answer` if the caller has them, such
+    as `daily.today().counts`.
+    """
+    remaining = dict(answer_counts(answer) if counts is None else counts)
+    marks = [ABSENT] * 5
+    for i, (alpha, alpha_val) in enumerate(zip(guess, answer)):
+        if alpha == alpha_val:
+            marks[i] = CORRECT
+            remaining[alpha] -= 1
+    for i, alpha in enumerate(guess):
+        if marks[i] == ABSENT and remaining.get(alpha, 0) > 0:
+            marks[i] = PRESENT
+            remaining[alpha] -= 1
+    return encode(marks)
+
+
+def encode(marks: Sequence[int]) -> int:
+    code = 0
+    for mark in reversed(marks):
+        code = code * 3 + mark
+    return code
+
+
+def decode(code: int) -> Tuple[int, ...]:
+    """Marks of each letter of a feedback code."""
+    marks = []
+    for _ in range(5):
+        code, mark = divmod(code, 3)
+        marks.append(mark)
+    return tuple(marks)
@@ -0,0 +1,148 @@
+"""Hints from a precomputed matrix of feedback codes.
+
+The matrix holds `score(guess, answer)` of every accepted guess (rows, in
+`WordIndex` order) against every answer (columns, in `answers` order) as
+uint8, about 30MB. It is built offline by `scripts/wordle_patterns.py` and
+memory-mapped, so a hint is a few column scans over the answers that are
+still possible instead of scoring all pairs again.
+
+Requires numpy, install the `hint` extra.
+"""
+
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from .scoring import CODE_COUNT, CORRECT, PRESENT
+from .wordindex import WORD_LENGTH, WordIndex
+
+ROW_CHUNK = 1024
+"""Guesses scanned at once, bounds temporary arrays to ~20MB."""
+
+_WEIGHTS: np.ndarray = 3 ** np.arange(WORD_LENGTH, dtype=np.uint8)
+
+
+def _letters(words: Iterable[str]) -> np.ndarray:
+    """Letters of `words` as an (n, 5) array of 0-25."""
+    data = "".join(words).encode("ascii")
+    return (np.frombuffer(data, dtype=np.uint8) - ord("a")).reshape(-1, WORD_LENGTH)
+
+
+def score_all(guess: str, answers: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """`score(guess, answer)` for every row of `answers`, vectorized.
+
+    `answers` is from `_letters` and `counts` is the (n, 26) letter counts of
+    each answer. Repeated letters are marked as `scoring.score` does.
+    """
+    letters = [ord(alpha) - ord("a") for alpha in guess]
+    correct = answers == np.array(letters, dtype=np.uint8)
+    # copies of each letter of the guess not yet marked in each answer
+    unmarked = {letter: counts[:, letter].copy() for letter in letters}
+    for i, letter in enumerate(letters):
+        unmarked[letter] -= correct[:, i]
+    marks = correct.astype(np.uint8) * CORRECT
+    for i, letter in enumerate(letters):
+        present = ~correct[:, i] & (unmarked[letter] > 0)
+        marks[present, i] = PRESENT
+        unmarked[letter] = unmarked[letter] - present
+    return marks @ _WEIGHTS
+
+
+def build_matrix(path: Path, index: WordIndex, answers: Sequence[str]) -> None:
+    """Write the matrix of `index` against `answers` to a `.npy` file."""
+    answer_letters = _letters(answers)
+    counts: np.ndarray = np.zeros((len(answers), 26), dtype=np.int8)
+    for i in range(WORD_LENGTH):
+        np.add.at(counts, (np.arange(len(answers)), answer_letters[:, i]), 1)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    matrix = np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.uint8, shape=(len(index), len(answers))
+    )
+    for row, guess in enumerate(index):
+        matrix[row] = score_all(guess, answer_letters, counts)
+    matrix.flush()
+
+
+class Hint(NamedTuple):
+    remaining: int
+    """Answers still consistent with the feedback so far."""
+    guess: str
+
+
+class PatternMatrix:
+    """Suggests guesses that split the remaining answers best.
+
+    A guess is rated by the entropy of the feedback it would get over the
+    remaining answers, ties go to guesses that may be the answer.
+    """
+
+    def __init__(self, path: Path, index: WordIndex, answers: Sequence[str]) -> None:
+        self.matrix: np.ndarray = np.load(path, mmap_mode="r")
+        if self.matrix.shape != (len(index), len(answers)) or (
+            self.matrix.dtype != np.uint8
+        ):
+            raise ValueError(
+                f"pattern matrix {path} does not match the word lists, rebuild it"
+            )
+        self.index = index
+        self.words = list(index)
+        self.answers = answers
+        # row of each answer, to tell whether a guess may be the answer
+        self.answer_rows = np.array(
+            [index.index(answer) for answer in answers], dtype=np.intp
+        )
+        self._opening: Optional[Hint] = None
+
+    def remaining(self, guesses: Sequence[str], codes: Sequence[int]) -> np.ndarray:
+        """Columns of answers consistent with every (guess, code)."""
+        mask: np.ndarray = np.ones(len(self.answers), dtype=bool)
+        for guess, code in zip(guesses, codes):
+            mask &= self.matrix[self.index.index(guess)] == code
+        return np.flatnonzero(mask)
+
+    def hint(
+        self, guesses: Sequence[str], codes: Sequence[int], hard: bool = False
+    ) -> Hint:
+        """Best next guess, among the remaining answers if `hard`.
+
+        Remaining answers always respect the hints revealed, so they are
+        valid guesses in hard mode.
+        """
+        if not guesses:
+            # nothing revealed yet, hard mode allows every word
+            if self._opening is None:
+                self._opening = self._best(np.arange(len(self.answers)))
+            return self._opening
+        return self._best(self.remaining(guesses, codes), hard)
+
+    def _best(self, columns: np.ndarray, hard: bool = False) -> Hint:
+        count = len(columns)
+        if count <= 2:
+            # guessing a remaining answer is at least as good as splitting
+            return Hint(count, self.answers[int(columns[0])])
+        candidates = self.answer_rows[columns]
+        rows = candidates if hard else np.arange(len(self.words))
+        entropy = np.empty(len(rows))
+        offsets: np.ndarray = np.arange(ROW_CHUNK, dtype=np.int32)[:, None] * CODE_COUNT
+        for start in range(0, len(rows), ROW_CHUNK):
+            chunk = rows[start : start + ROW_CHUNK]
+            # slices of the memmap read only those rows, unlike index arrays
+            block = np.asarray(
+                self.matrix[chunk] if hard else self.matrix[start : start + len(chunk)]
+            )[:, columns]
+            sizes = np.bincount(
+                (offsets[: len(chunk)] + block).ravel(),
+                minlength=len(chunk) * CODE_COUNT,
+            ).reshape(len(chunk), CODE_COUNT)
+            # H = log2(n) - sum(c * log2(c)) / n over feedback group sizes c
+            entropy[start : start + len(chunk)] = (
+                np.log2(count)
+                - (sizes * np.log2(np.maximum(sizes, 1))).sum(axis=1) / count
+            )
+        best = entropy.max()
+        # ties go to a remaining answer, which may win right away
+        tied = rows[entropy >= best - 1e-9]
+        tied_candidates = np.intersect1d(tied, candidates)
+        row = tied_candidates[0] if len(tied_candidates) else tied[0]
+        return Hint(count, self.words[int(row)])
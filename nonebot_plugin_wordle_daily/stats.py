@@ -0,0 +1,156 @@
+"""Statistics of finished games, kept as running counters.
+
+Games are counted once when they finish, so answering `wordle.stats` never
+looks at the sessions. Counters are handed to the store for persistence. The
+day's histogram and the leaderboard are loaded back on startup, a streak is
+loaded along with its user and dropped when the user is evicted.
+"""
+
+from datetime import date, timedelta
+from typing import Container, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+MAX_GUESSES = 6
+LEADERBOARD_SIZE = 10
+
+
+class StreakRecord(NamedTuple):
+    current: int
+    """Days won in a row up to `last_win`."""
+    best: int
+    last_win: Optional[date]
+
+
+class StatsRecord(NamedTuple):
+    histogram: List[int]
+    leaderboard: List[Tuple[int, str]]
+
+
+NO_STREAK = StreakRecord(0, 0, None)
+
+
+class DailyStats:
+    """Solve distribution of a day.
+
+    `histogram[i]` counts games solved in `i + 1` guesses, the last entry
+    counts games lost.
+    """
+
+    __slots__ = ("date", "histogram", "guesses")
+
+    def __init__(self, day: date, histogram: Sequence[int] = ()) -> None:
+        self.date = day
+        self.histogram = list(histogram) or [0] * (MAX_GUESSES + 1)
+        self.guesses = sum(
+            count * (i + 1) for i, count in enumerate(self.histogram[:MAX_GUESSES])
+        )
+        """Guesses of solved games in total."""
+
+    def record(self, guesses: int, won: bool) -> None:
+        if won:
+            self.histogram[guesses - 1] += 1
+            self.guesses += guesses
+        else:
+            self.histogram[MAX_GUESSES] += 1
+
+    @property
+    def players(self) -> int:
+        return sum(self.histogram)
+
+    @property
+    def solved(self) -> int:
+        return self.players - self.histogram[MAX_GUESSES]
+
+    @property
+    def average(self) -> Optional[float]:
+        """Mean guesses of solved games."""
+        solved = self.solved
+        return self.guesses / solved if solved else None
+
+
+class Stats:
+    """Today's distribution, streaks of resident users and the best streaks."""
+
+    def __init__(self, day: date) -> None:
+        self.day = DailyStats(day)
+        # loaded by `deps.load_streak`, must be present before `record`
+        self.streaks: Dict[str, StreakRecord] = {}
+        # (best streak, user id) in descending order, at most LEADERBOARD_SIZE
+        self.leaderboard: List[Tuple[int, str]] = []
+
+    def load(self, day: date, record: StatsRecord) -> None:
+        self.day = DailyStats(day, record.histogram)
+        self.leaderboard = sorted(record.leaderboard, reverse=True)[:LEADERBOARD_SIZE]
+
+    def rollover(self, day: date) -> None:
+        self.day = DailyStats(day)
+
+    def retain(self, user_ids: Container[str]) -> None:
+        """Drop the streaks of users not in `user_ids`."""
+        self.streaks = {
+            user_id: streak
+            for user_id, streak in self.streaks.items()
+            if user_id in user_ids
+        }
+
+    def record(self, user_id: str, day: date, guesses: int, won: bool) -> StreakRecord:
+        """Count a finished game, returns the new streak of the user.
+
+        A game already won on `day` is not counted again.
+        """
+        streak = self.streaks.get(user_id, NO_STREAK)
+        if streak.last_win == day:
+            return streak
+        if day != self.day.date:
+            self.rollover(day)
+        self.day.record(guesses, won)
+        if not won:
+            streak = streak._replace(current=0)
+        else:
+            current = streak.current + 1 if streak.last_win == day - timedelta(1) else 1
+            streak = StreakRecord(current, max(current, streak.best), day)
+            self._rank(user_id, streak.best)
+        self.streaks[user_id] = streak
+        return streak
+
+    def _rank(self, user_id: str, best: int) -> None:
+        board = self.leaderboard
+        if len(board) >= LEADERBOARD_SIZE and best <= board[-1][0]:
+            return
+        board[:] = [entry for entry in board if entry[1] != user_id]
+        board.append((best, user_id))
+        board.sort(reverse=True)
+        del board[LEADERBOARD_SIZE:]
+
+    def streak(self, user_id: str, today: date) -> StreakRecord:
+        """Streak of the user, current is 0 once a day is missed."""
+        streak = self.streaks.get(user_id, NO_STREAK)
+        if streak.last_win is None or streak.last_win < today - timedelta(1):
+            return streak._replace(current=0)
+        return streak
+
+    def summary(self, user_id: str, today: date, number: int) -> str:
+        """Human readable stats for the `wordle.stats` command."""
+        day = self.day if self.day.date == today else DailyStats(today)
+        lines = [f"Wordle {number}: {day.players} 人完成, {day.solved} 人猜中"]
+        for i, count in enumerate(day.histogram):
+            label = str(i + 1) if i < MAX_GUESSES else "X"
+            lines.append(f"{label}: {count}")
+        average = day.average
+        if average is not None:
+            lines.append(f"平均猜测次数: {average:.2f}")
+        streak = self.streak(user_id, today)
+        lines.append(f"您的连胜: {streak.current} 天, 最长 {streak.best} 天")
+        if self.leaderboard:
+            lines.append("最长连胜榜:")
+            lines.extend(
+                f"{rank}. {mask(entry_user)} {best} 天"
+                for rank, (best, entry_user) in enumerate(self.leaderboard, 1)
+            )
+        return "\n".join(lines)
+
+
+def mask(user_id: str) -> str:
+    """User id with all but its first and last two characters hidden."""
+    if len(user_id) <= 4:
+        return "*" * len(user_id)
+    return user_id[:2] + "*" * (len(user_id) - 4) + user_id[-2:]
@@ -0,0 +1,350 @@
+import asyncio
+import sqlite3
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from nonebot.log import logger
+
+from .stats import LEADERBOARD_SIZE, StatsRecord, StreakRecord
+
+T = TypeVar("T")
+
+
+class SessionRecord(NamedTuple):
+    date: date
+    recv_words: List[str]
+    recorded: bool = False
+    """Whether the finished game is counted in the stats."""
+
+
+class SessionStore(ABC):
+    """Persistence behind the resident users in `deps`.
+
+    `save` is called on the hot path and must not wait on I/O, `load` is only
+    called when a user is not resident.
+    """
+
+    async def open(self) -> None:
+        """Prepare the backend, called on bot startup."""
+
+    async def close(self) -> None:
+        """Write everything and release the backend, called on bot shutdown."""
+
+    @abstractmethod
+    async def load(self, user_id: str) -> Optional[SessionRecord]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, user_id: str, record: SessionRecord) -> None:
+        raise NotImplementedError
+
+    async def load_stats(self, day: date) -> StatsRecord:
+        """Histogram of `day` and the leaderboard, called on bot startup."""
+        return StatsRecord([], [])
+
+    async def load_streak(self, user_id: str) -> Optional[StreakRecord]:
+        """Streak of the user, called along with `load`."""
+        return None
+
+    def save_stats(
+        self,
+        day: date,
+        histogram: Sequence[int],
+        leaderboard: Sequence[Tuple[int, str]],
+        user_id: str,
+        streak: StreakRecord,
+    ) -> None:
+        """Hand the counters changed by a finished game, must not wait on I/O."""
+
+
+class MemoryStore(SessionStore):
+    """Keeps streaks until restart, sessions live only in the resident users.
+
+    Streaks are dropped with their users on each day rollover, so they must
+    outlive them here to build up over days.
+    """
+
+    def __init__(self) -> None:
+        self._streaks: Dict[str, StreakRecord] = {}
+
+    async def load(self, user_id: str) -> Optional[SessionRecord]:
+        return None
+
+    def save(self, user_id: str, record: SessionRecord) -> None:
+        pass
+
+    async def load_streak(self, user_id: str) -> Optional[StreakRecord]:
+        return self._streaks.get(user_id)
+
+    def save_stats(
+        self,
+        day: date,
+        histogram: Sequence[int],
+        leaderboard: Sequence[Tuple[int, str]],
+        user_id: str,
+        streak: StreakRecord,
+    ) -> None:
+        self._streaks[user_id] = streak
+
+
+class SQLiteStore(SessionStore):
+    """SQLite backend in WAL mode with write-behind.
+
+    `save` and `save_stats` only record the latest values in memory, a
+    background task writes pending ones in one transaction every
+    `flush_interval` seconds. All sqlite calls run in a dedicated thread that owns the
+    connection.
+    """
+
+    path: Path
+    flush_interval: float
+
+    def __init__(self, path: Path, flush_interval: float = 5.0) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, SessionRecord] = {}
+        # states being written by the running flush, still visible to `load`
+        self._writing: Dict[str, SessionRecord] = {}
+        self._pending_days: Dict[date, List[int]] = {}
+        self._pending_streaks: Dict[str, StreakRecord] = {}
+        self._writing_streaks: Dict[str, StreakRecord] = {}
+        self._pending_leaderboard: Optional[List[Tuple[int, str]]] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="wordle-sqlite")
+        self._flush_task: Optional["asyncio.Task[None]"] = None
+
+    async def _run(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        def call() -> T:
+            if self._conn is None:
+                raise RuntimeError("store is not opened")
+            return func(self._conn)
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    def _connect(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "user_id TEXT PRIMARY KEY, date TEXT NOT NULL, recv_words TEXT NOT NULL, "
+            "recorded INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(sessions)")]
+        if "recorded" not in columns:
+            # databases created before finished games were flagged
+            conn.execute(
+                "ALTER TABLE sessions ADD COLUMN recorded INTEGER NOT NULL DEFAULT 0"
+            )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS daily_stats ("
+            "date TEXT PRIMARY KEY, histogram TEXT NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS streaks ("
+            "user_id TEXT PRIMARY KEY, current INTEGER NOT NULL, "
+            "best INTEGER NOT NULL, last_win TEXT)"
+        )
+        seed_leaderboard = not conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'leaderboard'"
+        ).fetchone()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS leaderboard ("
+            "position INTEGER PRIMARY KEY, best INTEGER NOT NULL, user_id TEXT NOT NULL)"
+        )
+        if seed_leaderboard:
+            # databases created before the leaderboard was stored on its own
+            top = conn.execute(
+                "SELECT best, user_id FROM streaks WHERE best > 0 "
+                "ORDER BY best DESC, user_id DESC LIMIT ?",
+                (LEADERBOARD_SIZE,),
+            ).fetchall()
+            conn.executemany(
+                "INSERT INTO leaderboard VALUES (?, ?, ?)",
+                [
+                    (position, best, user_id)
+                    for position, (best, user_id) in enumerate(top)
+                ],
+            )
+        conn.commit()
+        self._conn = conn
+
+    async def open(self) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._connect)
+        self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            # a flush cut short puts its batch back, let it before the last one
+            await asyncio.wait([self._flush_task])
+            self._flush_task = None
+        await self.flush()
+        await self._run(lambda conn: conn.close())
+        self._conn = None
+        self._executor.shutdown()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.opt(exception=e).error("Failed to write wordle sessions")
+
+    async def flush(self) -> None:
+        """Write pending states now."""
+        if not (
+            self._pending
+            or self._pending_days
+            or self._pending_streaks
+            or self._pending_leaderboard is not None
+        ):
+            return
+        pending = self._writing = self._pending
+        days = self._pending_days
+        streaks = self._writing_streaks = self._pending_streaks
+        leaderboard = self._pending_leaderboard
+        self._pending, self._pending_days, self._pending_streaks = {}, {}, {}
+        self._pending_leaderboard = None
+        rows: List[Tuple[str, str, str, int]] = [
+            (
+                user_id,
+                record.date.isoformat(),
+                ",".join(record.recv_words),
+                record.recorded,
+            )
+            for user_id, record in pending.items()
+        ]
+        day_rows = [
+            (day.isoformat(), ",".join(map(str, histogram)))
+            for day, histogram in days.items()
+        ]
+        streak_rows = [
+            (
+                user_id,
+                streak.current,
+                streak.best,
+                streak.last_win.isoformat() if streak.last_win else None,
+            )
+            for user_id, streak in streaks.items()
+        ]
+
+        def write(conn: sqlite3.Connection) -> None:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)", rows
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO daily_stats VALUES (?, ?)", day_rows
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO streaks VALUES (?, ?, ?, ?)", streak_rows
+                )
+                if leaderboard is not None:
+                    conn.execute("DELETE FROM leaderboard")
+                    conn.executemany(
+                        "INSERT INTO leaderboard VALUES (?, ?, ?)",
+                        [
+                            (position, best, user_id)
+                            for position, (best, user_id) in enumerate(leaderboard)
+                        ],
+                    )
+
+        try:
+            await self._run(write)
+        except BaseException:
+            # also when cancelled, a write still queued on the thread is
+            # dropped; keep newer states saved meanwhile
+            self._pending = {**pending, **self._pending}
+            self._pending_days = {**days, **self._pending_days}
+            self._pending_streaks = {**streaks, **self._pending_streaks}
+            if self._pending_leaderboard is None:
+                self._pending_leaderboard = leaderboard
+            raise
+        finally:
+            self._writing, self._writing_streaks = {}, {}
+
+    async def load(self, user_id: str) -> Optional[SessionRecord]:
+        record = self._pending.get(user_id) or self._writing.get(user_id)
+        if record is not None:
+            return record
+        row = await self._run(
+            lambda conn: conn.execute(
+                "SELECT date, recv_words, recorded FROM sessions WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+        )
+        if row is None:
+            return None
+        return SessionRecord(
+            date.fromisoformat(row[0]),
+            row[1].split(",") if row[1] else [],
+            bool(row[2]),
+        )
+
+    def save(self, user_id: str, record: SessionRecord) -> None:
+        self._pending[user_id] = record
+
+    async def load_stats(self, day: date) -> StatsRecord:
+        def read(
+            conn: sqlite3.Connection,
+        ) -> Tuple[Optional[Tuple[str]], List[Tuple[int, str]]]:
+            histogram = conn.execute(
+                "SELECT histogram FROM daily_stats WHERE date = ?", (day.isoformat(),)
+            ).fetchone()
+            leaderboard = conn.execute(
+                "SELECT best, user_id FROM leaderboard ORDER BY position"
+            ).fetchall()
+            return histogram, leaderboard
+
+        histogram, leaderboard = await self._run(read)
+        return StatsRecord(
+            [int(count) for count in histogram[0].split(",")] if histogram else [],
+            leaderboard,
+        )
+
+    async def load_streak(self, user_id: str) -> Optional[StreakRecord]:
+        streak = self._pending_streaks.get(user_id) or self._writing_streaks.get(
+            user_id
+        )
+        if streak is not None:
+            return streak
+        row = await self._run(
+            lambda conn: conn.execute(
+                "SELECT current, best, last_win FROM streaks WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+        )
+        if row is None:
+            return None
+        current, best, last_win = row
+        return StreakRecord(
+            current, best, date.fromisoformat(last_win) if last_win else None
+        )
+
+    def save_stats(
+        self,
+        day: date,
+        histogram: Sequence[int],
+        leaderboard: Sequence[Tuple[int, str]],
+        user_id: str,
+        streak: StreakRecord,
+    ) -> None:
+        self._pending_days[day] = list(histogram)
+        self._pending_leaderboard = list(leaderboard)
+        self._pending_streaks[user_id] = streak
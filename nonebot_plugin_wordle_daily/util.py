@@ -1,36 +1,127 @@
-from datetime import datetime
+import itertools
 from functools import lru_cache
 from io import BytesIO
-from typing import List
+from typing import Any, Dict, List, Literal, Sequence, Tuple
 
-from PIL import Image
+from PIL import Image, ImageColor
 
-from .consts import Ma, Oa
+from .constraints import ConstraintIndex
+from .daily import today
+from .scoring import ABSENT, CORRECT, PRESENT, decode
+from .wordindex import WordIndex
+from .words import allowed, answers
 
 
-def im2bytes(im: Image.Image, format: str = "PNG") -> bytes:
-    """Returns bytes of image."""
+def im2bytes(im: Image.Image, format: str = "PNG", **params: Any) -> bytes:
+    """Returns bytes of image, `params` are passed to `Image.save`."""
     buffer = BytesIO()
-    im.save(buffer, format=format)
+    im.save(buffer, format=format, **params)
     return buffer.getvalue()
 
 
-def _get_answer_index() -> int:
-    return (datetime.now() - datetime(2021, 6, 19)).days
+ImageFormat = Literal["png", "webp", "jpeg"]
+CompressPreset = Literal["fast", "default", "small"]
+
+_SAVE_PARAMS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "png": {
+        "fast": {"compress_level": 1},
+        "default": {"compress_level": 6},
+        "small": {"compress_level": 9, "optimize": True},
+    },
+    "webp": {
+        "fast": {"lossless": True, "quality": 0, "method": 1},
+        "default": {"lossless": True, "quality": 25, "method": 2},
+        "small": {"lossless": True, "quality": 75, "method": 4},
+    },
+    "jpeg": {
+        "fast": {"quality": 90},
+        "default": {"quality": 90, "optimize": True},
+        "small": {"quality": 75, "optimize": True},
+    },
+}
+
+# (background, foreground) of tiles and keys, a ramp between each pair covers
+# the antialiased glyph edges
+_PALETTE_RAMPS = (
+    ("#ffffff", "#6aaa64"),
+    ("#ffffff", "#c9b458"),
+    ("#ffffff", "#787c7e"),
+    ("#000000", "#d3d6da"),
+)
+_PALETTE_STEPS = 16
 
 
 @lru_cache(maxsize=1)
-def _get_answer(index: int) -> str:
-    return Ma[index]
+def _wordle_palette() -> Image.Image:
+    colors: List[Tuple[int, ...]] = []
+    for start, end in _PALETTE_RAMPS:
+        rgb0, rgb1 = ImageColor.getrgb(start), ImageColor.getrgb(end)
+        for step in range(_PALETTE_STEPS):
+            color = tuple(
+                round(c0 + (c1 - c0) * step / (_PALETTE_STEPS - 1))
+                for c0, c1 in zip(rgb0, rgb1)
+            )
+            if color not in colors:
+                colors.append(color)
+    palette = Image.new("P", (1, 1))
+    palette.putpalette([c for color in colors for c in color])
+    return palette
+
+
+class ImageEncoder:
+    """Encode board images in the configured format.
+
+    Args:
+        format: output format
+        compress: speed/size tradeoff, see `_SAVE_PARAMS`
+        palette: quantize to the fixed wordle palette first, ignored if not png
+    """
+
+    __slots__ = ("format", "compress", "palette")
+
+    def __init__(
+        self,
+        format: ImageFormat = "png",
+        compress: CompressPreset = "default",
+        palette: bool = False,
+    ) -> None:
+        self.format = format
+        self.compress = compress
+        self.palette = palette
+
+    @property
+    def key(self) -> Tuple[str, str, bool]:
+        """Identifies the output of this encoder."""
+        return (self.format, self.compress, self.palette)
+
+    def __call__(self, im: Image.Image) -> bytes:
+        if self.palette and self.format == "png":
+            # Image.NONE is Image.Dither.NONE since Pillow 9.1
+            im = im.quantize(palette=_wordle_palette(), dither=Image.NONE)
+        return im2bytes(
+            im, self.format.upper(), **_SAVE_PARAMS[self.format][self.compress]
+        )
 
 
 def get_answer() -> str:
     """Get today's wordle game answer."""
-    return _get_answer(_get_answer_index())
+    return today().answer
+
+
+@lru_cache(maxsize=1)
+def get_word_index() -> WordIndex:
+    """Index of all accepted words, built on first use."""
+    return WordIndex(itertools.chain(answers, allowed))
+
+
+@lru_cache(maxsize=1)
+def get_constraint_index() -> ConstraintIndex:
+    """Letter masks of the answers, built on first use."""
+    return ConstraintIndex(answers)
 
 
 def validate_word(word: str) -> bool:
-    return word in Ma or word in Oa
+    return word in get_word_index()
 
 
 # Wordle 281 2/6
@@ -39,21 +130,16 @@ def validate_word(word: str) -> bool:
 # 🟩🟩🟩🟩🟩
 
 
-def _generate_share_msg(word: str) -> str:
-    answer = get_answer()
-    result: List[str] = []
-    for i, alpha in enumerate(word):
-        if alpha == answer[i]:
-            result.append("🟩")
-        elif alpha in answer:
-            result.append("🟨")
-        else:
-            result.append("⬜")
-    return "".join(result)
+_SHARE_MARKS = {CORRECT: "🟩", PRESENT: "🟨", ABSENT: "⬜"}
+
+
+def _generate_share_msg(code: int) -> str:
+    return "".join(_SHARE_MARKS[mark] for mark in decode(code))
 
 
-def generate_share_msg(words: List[str]) -> str:
+def generate_share_msg(codes: Sequence[int]) -> str:
+    """Share message of a game from the feedback codes of its guesses."""
     return "{text}\n\n{board}".format(
-        text=f"Wordle {_get_answer_index()} {len(words)}/6",
-        board="\n".join(_generate_share_msg(word) for word in words),
+        text=f"Wordle {today().number} {len(codes)}/6",
+        board="\n".join(_generate_share_msg(code) for code in codes),
     )
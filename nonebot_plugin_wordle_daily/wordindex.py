@@ -0,0 +1,81 @@
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator
+
+WORD_LENGTH = 5
+
+_BASE = 26
+_ORD_A = ord("a")
+# maps a-z to base-26 digits understood by `int(..., 26)`
+_TO_DIGITS = str.maketrans("abcdefghijklmnopqrstuvwxyz", "0123456789abcdefghijklmnop")
+
+
+def pack_word(word: str) -> int:
+    """Pack a lowercase 5-letter word into a base-26 integer.
+
+    The result is less than 26**5 (11881376), so it fits in an unsigned int.
+
+    Raises:
+        ValueError: if the word is not 5 lowercase ascii letters
+    """
+    if len(word) != WORD_LENGTH:
+        raise ValueError(f"word {word!r} is not {WORD_LENGTH} letters")
+    if not (word.isascii() and word.isalpha() and word.islower()):
+        raise ValueError(f"word {word!r} contains non-lowercase letter")
+    return int(word.translate(_TO_DIGITS), _BASE)
+
+
+def unpack_word(code: int) -> str:
+    """Inverse of `pack_word`."""
+    chars = []
+    for _ in range(WORD_LENGTH):
+        code, value = divmod(code, _BASE)
+        chars.append(chr(value + _ORD_A))
+    return "".join(reversed(chars))
+
+
+class WordIndex:
+    """Compact membership index of 5-letter words.
+
+    Words are stored as packed integers in a sorted `array('I')`, which takes
+    4 bytes per word instead of a full `str` object. Lookup is a binary search
+    done by the C `bisect` module, so it costs ~14 probes for 13k words rather
+    than a linear scan over a tuple.
+    """
+
+    __slots__ = ("_codes",)
+
+    def __init__(self, words: Iterable[str]) -> None:
+        self._codes = array("I", sorted({pack_word(word) for word in words}))
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str):
+            return False
+        try:
+            self.index(word)
+        except ValueError:
+            return False
+        return True
+
+    def index(self, word: str) -> int:
+        """Position of `word` in sorted order, a stable id of the word.
+
+        Raises:
+            ValueError: if the word is not in the index
+        """
+        code = pack_word(word)
+        codes = self._codes
+        index = bisect_left(codes, code)
+        if index == len(codes) or codes[index] != code:
+            raise ValueError(f"word {word!r} is not in index")
+        return index
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __iter__(self) -> Iterator[str]:
+        return (unpack_word(code) for code in self._codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self._codes.itemsize * len(self._codes)
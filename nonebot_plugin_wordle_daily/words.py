@@ -0,0 +1,60 @@
+"""Word lists of wordle, loaded on first use.
+
+Each list is an asset of lowercase ascii words concatenated without
+separators, 5 bytes per word, and is memory-mapped rather than read.
+`answers` are the daily answers in order, `allowed` are the other words
+accepted as guesses.
+"""
+
+import mmap
+from pathlib import Path
+from typing import Iterator, Optional, Sequence, Union, overload
+
+from .wordindex import WORD_LENGTH
+
+ASSETS = Path(__file__).parent / "assets"
+
+
+class WordList(Sequence[str]):
+    """Read-only sequence of the words in a memory-mapped asset."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._buffer: Optional[mmap.mmap] = None
+
+    @property
+    def buffer(self) -> mmap.mmap:
+        if self._buffer is None:
+            with open(self.path, "rb") as f:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._buffer
+
+    def __len__(self) -> int:
+        return len(self.buffer) // WORD_LENGTH
+
+    @overload
+    def __getitem__(self, index: int) -> str:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[str]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, Sequence[str]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not (0 <= index < length):
+            raise IndexError("word index out of range")
+        start = index * WORD_LENGTH
+        return self.buffer[start : start + WORD_LENGTH].decode("ascii")
+
+    def __iter__(self) -> Iterator[str]:
+        data = self.buffer[:].decode("ascii")
+        return (data[i : i + WORD_LENGTH] for i in range(0, len(data), WORD_LENGTH))
+
+
+answers = WordList(ASSETS / "answers.bin")
+allowed = WordList(ASSETS / "allowed.bin")
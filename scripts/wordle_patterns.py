@@ -0,0 +1,78 @@
+"""Build or verify the pattern matrix used by wordle hints.
+
+Usage:
+    python scripts/wordle_patterns.py build [--output PATH]
+    python scripts/wordle_patterns.py verify [--output PATH] [--samples N]
+
+Then set `WORDLE_PATTERN_MATRIX` to the output path. Rebuild whenever the
+word lists change, the plugin refuses a matrix of another shape.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import nonebot
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# importing the plugin package requires an initialized nonebot
+nonebot.init(driver="~none", log_level="WARNING")
+
+from nonebot_plugin_wordle_daily.scoring import score  # noqa: E402
+from nonebot_plugin_wordle_daily.solver import (  # noqa: E402
+    PatternMatrix,
+    build_matrix,
+)
+from nonebot_plugin_wordle_daily.util import get_word_index  # noqa: E402
+from nonebot_plugin_wordle_daily.words import answers  # noqa: E402
+
+DEFAULT_OUTPUT = Path("data") / "wordle" / "patterns.npy"
+
+
+def build(output: Path) -> None:
+    start = time.perf_counter()
+    build_matrix(output, get_word_index(), answers)
+    elapsed = time.perf_counter() - start
+    print(f"wrote {output} ({output.stat().st_size} bytes) in {elapsed:.1f}s")
+
+
+def verify(output: Path, samples: int) -> None:
+    """Compare random cells and every cell of the first answer with `score`."""
+    index = get_word_index()
+    matrix = PatternMatrix(output, index, answers).matrix
+    words = list(index)
+    cells = [(row, 0) for row in range(len(words))]
+    cells.extend(
+        (random.randrange(len(words)), random.randrange(len(answers)))
+        for _ in range(samples)
+    )
+    mismatches = 0
+    for row, column in cells:
+        expected = score(words[row], answers[column])
+        if matrix[row, column] != expected:
+            mismatches += 1
+            print(
+                f"{words[row]} vs {answers[column]}: {matrix[row, column]} != {expected}"
+            )
+    print(f"checked {len(cells)} cells, {mismatches} mismatches")
+    if mismatches:
+        sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("build", "verify"))
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--samples", type=int, default=100000)
+    args = parser.parse_args()
+    if args.command == "build":
+        build(args.output)
+    else:
+        verify(args.output, args.samples)
+
+
+if __name__ == "__main__":
+    main()